@@ -12,6 +12,7 @@
 # add these directories to sys.path here. If the directory is relative to the
 # documentation root, use os.path.abspath to make it absolute, like shown here.
 #
+import importlib.util
 import os
 import sys
 
@@ -19,12 +20,14 @@ import sphinx_bootstrap_theme
 sys.path.insert(0, os.path.abspath('../..'))
 
 # load in version variables into 'version_info' dict
+# going through the import machinery (instead of exec'ing the raw source)
+# lets python cache the compiled bytecode between builds
 CURRENT_DIR = os.path.dirname(__file__)
 VERSION_FILE = os.path.join(CURRENT_DIR,'..','..','imagepypelines','version_info.py')
-with open(VERSION_FILE,'r') as f:
-    raw = f.read()
-version_info = {}
-exec(raw,{},version_info)
+_spec = importlib.util.spec_from_file_location('version_info', VERSION_FILE)
+_version_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_version_module)
+version_info = vars(_version_module)
 
 # -- Project information -----------------------------------------------------
 project = "ImagePypelines"
@@ -65,11 +68,22 @@ extensions = [
     'sphinx.ext.napoleon',   # nD: support for google style docstrings
     'sphinx.ext.githubpages', # JM add .nojekyll creation for github
     'sphinx.ext.doctest', # JM: adds doctest directives
-    'sphinx_automodapi.automodapi', # makes separate doc pages for every object
-    # 'sphinx_automodapi.smart_resolver', # don't think this is needed
-    'sphinx_copybutton', # adds a copy button to our examples (NOT THE SAME AS copybutton.js)
     ]
 
+# sphinx-build passes the builder with '-b' (html if unspecified). automodapi
+# and copybutton only matter for html output and are slow to import, so skip
+# them for doctest/latex/man builds to keep their startup fast
+_builder = 'html'
+if '-b' in sys.argv:
+    _builder = sys.argv[sys.argv.index('-b') + 1]
+
+if _builder in ('html', 'dirhtml'):
+    extensions += [
+        'sphinx_automodapi.automodapi', # makes separate doc pages for every object
+        # 'sphinx_automodapi.smart_resolver', # don't think this is needed
+        'sphinx_copybutton', # adds a copy button to our examples (NOT THE SAME AS copybutton.js)
+        ]
+
 # doctest config
 doctest_global_setup = '''
 import imagepypelines as ip
@@ -10,13 +10,26 @@ from .constants import NUMPY_TYPES, UUID_ORDER
 from .Exceptions import BlockError
 from .arg_checking import DEFAULT_SHAPE_FUNCS, HOMOGENUS_CONTAINERS
 
-from uuid import uuid4
+from .util import new_uuid
 from abc import ABCMeta, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from itertools import chain
+from threading import Event, Thread
 import inspect
 import copy
+import queue
 import numpy as np
 
+_PREFETCH_DONE = object()
+"""sentinel queued by the prefetch producer to mark the end of the data"""
+
+_ARG_NAMES_CACHE = {}
+"""module level cache of process argument name tuples keyed by the process
+function's code object. every instance of a given Block subclass shares the
+same process function, so repeated pipeline construction only pays for
+introspection once per subclass"""
+
+
 class Block(metaclass=ABCMeta):
     """a contained algorithmic element used to construct pipelines. This class
     is designed to be inherited from, or used in the form of one of its child
@@ -36,9 +49,15 @@ class Block(metaclass=ABCMeta):
             run in a pipeline this logger is temporaily replaced with a child of
             the Pipeline's logger
         tags(:obj:`set`): tags to describe this block. unused as of March 2020
+        parallel(bool): whether "each" batches are processed concurrently on
+            a thread pool
+        workers(int,None): number of worker threads used when parallel is True
+        prefetch_depth(int): number of "each" batches assembled ahead of the
+            process function. 0 disables prefetching
         _arg_spec(:obj:`namedtuple`,None): a named tuple describing the
-            arguments for this block's process function. Only defined if the
-            property `block.args` is accessed.
+            arguments for this block's process function. Only defined by
+            subclasses that introspect their own process function (the base
+            block reads argument names off the code object directly).
         skip_enforcement(bool): whether or not to enforce type and shape checking
         types(:obj:`dict`): Dictionary of input types. If arg doesn't exist
             as a key, or if the value is None, then no checking is done
@@ -57,7 +76,10 @@ class Block(metaclass=ABCMeta):
                     batch_type="all",
                     types=None,
                     shapes=None,
-                    containers=None):
+                    containers=None,
+                    parallel=False,
+                    workers=None,
+                    prefetch_depth=0):
         """instantiates the block
 
         Args:
@@ -82,11 +104,20 @@ class Block(metaclass=ABCMeta):
                 keys, None as values.
                 *if batch_type is "each", then the container is irrelevant and can
                 be safely ignored!*
+            parallel(bool): whether to process "each" batches concurrently on
+                a thread pool. Only worthwhile for process functions that
+                release the GIL (numpy kernels, IO). defaults to False
+            workers(int,None): number of worker threads when `parallel` is
+                True. None defers to the ThreadPoolExecutor default
+            prefetch_depth(int): number of "each" batches to assemble ahead
+                of the process function on a producer thread. 0 (the
+                default) keeps batch generation inline; only worth enabling
+                when datum generation is expensive relative to process
         """
         assert (batch_type in ["all","each"] or isinstance(batch_type,int))
 
         # setup absolutely unique id for this block
-        self.uuid = uuid4().hex
+        self.uuid = new_uuid()
 
         # ------ setting up instance variables
         if name is None:
@@ -94,14 +125,25 @@ class Block(metaclass=ABCMeta):
         self.name = name
         self.batch_type = batch_type
 
+        # cached "name#uuid" string - recomputed whenever name or uuid change
+        self._update_id()
+
         # this will be defined in _pipeline_pair
         self.logger = get_logger( self.id )
 
         # setup initial tags
         self.tags = set()
 
+        # batch parallelism - the pool itself is built lazily on first use
+        self.parallel = parallel
+        self.workers = workers
+        self._executor = None
+        self.prefetch_depth = prefetch_depth
+
         # FullArgSpec for this block, defined in self.args
         self._arg_spec = None
+        # per-instance cache for the args property
+        self._args = None
 
         # TYPE AND SHAPE CHECKING VARS
         # ----------------------------------------------------------------------
@@ -133,6 +175,10 @@ class Block(metaclass=ABCMeta):
 
         self.shape_fns = DEFAULT_SHAPE_FUNCS.copy()
 
+        # per-arg (name, types, shapes, containers) tuples, built lazily by
+        # _get_validators and invalidated by enforce()
+        self._validators = None
+
         super(Block,self).__init__() # for metaclass?
 
 
@@ -191,30 +237,40 @@ class Block(metaclass=ABCMeta):
         if not isinstance(name,str):
             raise BlockError("name must be string")
 
-        self.logger.warning("being renamed from '%s' to '%s'" % self.name, name)
+        self.logger.warning("being renamed from '%s' to '%s'" % (self.name, name))
         old_name = self.name
         self.name = name
+        self._update_id()
         # reset the logger
         self._unpair_logger()
         # log the new name
-        self.logger.warning("renamed from '%s' to '%s'" % old_name, self.name)
+        self.logger.warning("renamed from '%s' to '%s'" % (old_name, self.name))
 
     ############################################################################
     def copy(self):
         """fetches a shallow copy of this block with the UUID updated"""
         # NOTE: make sure this results in the same behavior as unpickling
-        # the uuid must be updated
-        copied = copy.copy(self)
-        copied.uuid = uuid4().hex
+        # clone the instance dict directly - the generic copy protocol goes
+        # through __reduce_ex__/__setstate__ which is much slower for a
+        # handful of fields. the uuid must be updated
+        copied = self.__class__.__new__(self.__class__)
+        copied.__dict__ = self.__dict__.copy()
+        copied.uuid = new_uuid()
+        copied._update_id()
         return copied
 
     ############################################################################
     def deepcopy(self):
         """fetches a deep copy of this block with the UUID updated"""
         # NOTE: make sure this results in the same behavior as unpickling
-        # the uuid must be updated
-        deepcopied = copy.deepcopy(self)
-        deepcopied.uuid = uuid4().hex
+        # seed the memo so the logger (and its handlers) is swapped for a
+        # fresh one instead of being deep copied. the uuid must be updated
+        memo = {id(self.logger) : get_logger(self.id)}
+        deepcopied = copy.deepcopy(self, memo)
+        deepcopied.uuid = new_uuid()
+        deepcopied._update_id()
+        # the memo'd logger still carries the old id - refetch with the new one
+        deepcopied._unpair_logger()
         return deepcopied
 
     ############################################################################
@@ -256,6 +312,9 @@ class Block(metaclass=ABCMeta):
         self.shapes[arg] = shapes
         self.containers[arg] = containers
 
+        # the precomputed validators are stale now - rebuild on next check
+        self._validators = None
+
         return self
 
     ############################################################################
@@ -278,15 +337,18 @@ class Block(metaclass=ABCMeta):
         self._pair_logger(logger)
         # NOTE: add type checking here
 
-        # check data partity (same n_items for every data)
-        # this still works even if len(data) is 0
-        if not all(data[0].n_items == d.n_items for d in data):
-            msg = "Invalid data lengths! all data must have the same"\
-                    + "number of items. {}"
-            # this adds a list ("input_name.n_items"=)
-            msg.format(",".join("{}.n_items={}".format(d.n_items) for i,d in zip(self.inputs,data)))
-            self.logger.error(msg)
-            raise RuntimeError(msg)
+        # check data parity (same n_items for every data)
+        # single-input blocks (the common case) have nothing to compare
+        if len(data) > 1:
+            n_items = data[0].n_items
+            if not all(d.n_items == n_items for d in data):
+                # this adds a list ("arg_name.n_items=...")
+                msg = "Invalid data lengths! all data must have the same "\
+                        "number of items. {}".format(
+                        ", ".join("{}.n_items={}".format(arg, d.n_items)
+                                    for arg,d in zip(self.args, data)))
+                self.logger.error(msg)
+                raise RuntimeError(msg)
 
         # run preprocess
         self.preprocess()
@@ -312,16 +374,45 @@ class Block(metaclass=ABCMeta):
             # EACH - every batch is a datum
             if self.batch_type == "each":
                 # construct the batch generators
-                def _process_batches(*data):
-                    batches = (d.as_each() for d in data)
-                    for datums in zip(*batches):
-                        out = self.process(*datums)
-                        # put it a tuple if it isn't already
-                        if not isinstance(out, tuple):
-                            out = (out, )
-                        yield out
-
-                ret = tuple( zip(*_process_batches(*data)) )
+                batches = (d.as_each() for d in data)
+                datum_iter = zip(*batches)
+
+                # overlap batch assembly with processing on a producer
+                # thread. redundant under parallel=True, where executor.map
+                # already drains the iterator ahead of the workers
+                if self.prefetch_depth > 0 and not self.parallel:
+                    datum_iter = self._prefetch(datum_iter)
+
+                if self.parallel:
+                    # executor.map preserves submission order, so parallel
+                    # output ordering is identical to the serial path. this
+                    # only pays off when process releases the GIL
+                    outputs = self._get_executor().map(self._process_each,
+                                                        datum_iter)
+                else:
+                    outputs = map(self._process_each, datum_iter)
+
+                # append each output into its own buffer as we go rather than
+                # materializing every per-datum tuple and transposing the lot
+                # with zip(*...) at the end - one tuple layer per datum instead
+                # of two
+                out_buffers = None
+                for out in outputs:
+                    # put it a tuple if it isn't already
+                    if not isinstance(out, tuple):
+                        out = (out, )
+
+                    if out_buffers is None:
+                        # number of outputs is known after the first datum
+                        out_buffers = tuple( [o] for o in out )
+                    else:
+                        for buffer,o in zip(out_buffers, out):
+                            buffer.append(o)
+
+                if out_buffers is None:
+                    ret = tuple()
+                else:
+                    ret = tuple( tuple(buffer) for buffer in out_buffers )
 
             # ALL - process everything at once
             else:
@@ -333,26 +424,112 @@ class Block(metaclass=ABCMeta):
 
         return ret
 
+    ############################################################################
+    def _process_each(self, datums):
+        """unpacks one tuple of datums into the process function"""
+        return self.process(*datums)
+
+    ############################################################################
+    def _prefetch(self, datum_iter):
+        """yields datums pulled from a bounded-queue producer thread so the
+        next batch is assembled while process runs on the current one"""
+        prefetched = queue.Queue(maxsize=self.prefetch_depth)
+        stop = Event()
+        errors = []
+
+        def _produce():
+            try:
+                for datums in datum_iter:
+                    if stop.is_set():
+                        break
+                    prefetched.put(datums)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                prefetched.put(_PREFETCH_DONE)
+
+        producer = Thread(target=_produce,
+                            name="%s-prefetch" % self.id,
+                            daemon=True)
+        producer.start()
+
+        try:
+            while True:
+                datums = prefetched.get()
+                if datums is _PREFETCH_DONE:
+                    break
+                yield datums
+        finally:
+            # if the consumer abandons the generator mid-stream (process
+            # raised), the producer may be blocked on a full queue - tell
+            # it to stop and drain its slots until it exits so failed
+            # runs don't leak a permanently blocked thread
+            stop.set()
+            while producer.is_alive():
+                try:
+                    while True:
+                        prefetched.get_nowait()
+                except queue.Empty:
+                    pass
+                producer.join(timeout=0.1)
+
+        # surface generator failures in the consuming thread
+        if errors:
+            raise errors[0]
+
+    ############################################################################
+    def _get_executor(self):
+        """lazily builds the thread pool shared by every parallel run"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix=self.id)
+        return self._executor
+
+    ############################################################################
+    def _get_validators(self):
+        """fetches the per-arg (name, types, shapes, containers) tuples,
+        building them on first use. The enforcement rules for an arg are
+        constant for every datum and every call, so the dict lookups happen
+        once here instead of inside the batch loop. enforce() invalidates
+        this cache"""
+        if self._validators is None:
+            self._validators = tuple(
+                    (arg,
+                        self.types.get(arg, None),
+                        self.shapes.get(arg, None),
+                        self.containers.get(arg, None))
+                    for arg in self.args)
+        return self._validators
+
     ############################################################################
     def _check_batches(self, *data):
         """checks argument batches to verify if they are the correct type and shapes
         """
+        # skip all validation work if enforcement is disabled for this block
+        if self.skip_enforcement:
+            return
+
         all_data = (d.as_all() for d in data)
+        check_container = (self.batch_type == "all")
         # FOR EVERY ARG AND BATCH
         # ======================================================================
-        for arg_name,data_container in zip(self.args, all_data):
+        for validator,data_container in zip(self._get_validators(), all_data):
+            arg_name, arg_types, arg_shapes, okay_containers = validator
+
             # ---------- CONTAINER CHECK ----------
             # we have to check the container if datums aren't passed in individually
-            if self.batch_type == "all":
-                okay_containers = self.containers.get(arg_name,None)
+            if check_container:
                 if okay_containers is not None:
                     # check the container type is valid
                     if not isinstance(data_container, okay_containers):
                         msg = "invalid container for '{}'. must be {}, not {}. (you can disable this check with the 'skip_enforcement' keyword)"
-                        msg = msg.format(arg_name, okay_containers, type(batch))
+                        msg = msg.format(arg_name, okay_containers, type(data_container))
                         self.logger.error(msg)
                         raise BlockError(msg)
 
+            # nothing to check per-datum for this arg
+            if (arg_types is None) and (arg_shapes is None):
+                continue
 
             # check if it's a homogenus container
             # for example if it's a numpy array, we can speed thing sup because
@@ -367,21 +544,17 @@ class Block(metaclass=ABCMeta):
                 # ---------------------------------------
                 # TYPE CHECKING
                 # ---------------------------------------
-                # fetch the accepted types for this arg
-                arg_types = self.types.get(arg_name, None)
                 # if arg_types is None, then we will skip all type checking
                 if not (arg_types is None):
                     if not isinstance(datum, arg_types):
                         msg = "invalid type for '{}'. must be {}, not {}. (you can disable this check with the 'skip_enforcement' keyword)"
-                        msg = msg.format(arg_name, arg_types, type(batch))
+                        msg = msg.format(arg_name, arg_types, type(datum))
                         self.logger.error(msg)
                         raise BlockError(msg)
 
                 # ---------------------------------------
                 # SHAPE CHECKING
                 # ---------------------------------------
-                # fetch the accepted shapes for this arg
-                arg_shapes = self.shapes.get(arg_name, None)
                 # if arg_shapes is None, then we will skip all shape checking
                 if not (arg_shapes is None):
                     # skip shape checking if we don't have a shape_fn
@@ -391,29 +564,20 @@ class Block(metaclass=ABCMeta):
 
                     # retrieve datum shape
                     datum_shape = shape_fn(datum)
-
-                    # FOR ARG SHAPE in all possible arg shapes
-                    # ==========================================================
-                    ndim_okay = False
-                    axes_okay = True
-                    for arg_shape in arg_shapes:
-                        # reject automatically unless at least one shape has
-                        # right number of dimensions
-                        if len(arg_shape) != len(datum_shape):
-                            continue
-
-                        ndim_okay = True
-
-                        # otherwise check every axis
-                        for arg_ax,d_ax in zip(arg_shape,datum_shape):
-                            # no need to check if the arg_ax is None (any length)
-                            if arg_ax is None:
-                                continue
-                            # compare every axis length
-                            axes_okay = (axes_okay and (arg_ax == d_ax))
+                    ndim = len(datum_shape)
+
+                    # the datum is okay if any accepted shape matches in both
+                    # rank and axis lengths (None axes match any length).
+                    # any()/all() short-circuit at the C level, so checking
+                    # stops at the first accepted shape that fits
+                    shape_okay = any(
+                            (len(arg_shape) == ndim)
+                            and all((arg_ax is None) or (arg_ax == d_ax)
+                                    for arg_ax,d_ax in zip(arg_shape,datum_shape))
+                            for arg_shape in arg_shapes)
 
                     # raise a shape error
-                    if not (axes_okay and ndim_okay):
+                    if not shape_okay:
                         msg = "invalid shape for '{}'. must be {}, not {}"
                         msg = msg.format(arg_name, arg_shapes, datum_shape)
                         self.logger.error(msg)
@@ -468,6 +632,11 @@ class Block(metaclass=ABCMeta):
         """restores the original block logger"""
         self.logger = get_logger(self.id)
 
+    ############################################################################
+    def _update_id(self):
+        """recomputes the cached id string from the current name and uuid"""
+        self._id = "{}#{}".format(self.name, self.uuid[-UUID_ORDER:])
+
 
 
     ############################################################################
@@ -491,13 +660,18 @@ class Block(metaclass=ABCMeta):
 
     ############################################################################
     def __getstate__(self):
-        return self.__dict__
+        state = self.__dict__.copy()
+        # thread pools can't be pickled - a new one is built lazily on the
+        # first parallel run after unpickling
+        state['_executor'] = None
+        return state
 
     ############################################################################
     def __setstate__(self, state):
         """resets the uuid in the event of a copy"""
-        state['uuid'] = uuid4().hex
+        state['uuid'] = new_uuid()
         self.__dict__.update(state)
+        self._update_id()
 
 
     ############################################################################
@@ -506,14 +680,33 @@ class Block(metaclass=ABCMeta):
     @property
     def args(self):
         """:obj:`list` of :obj:`str`: arguments in the order they are expected"""
-        if self._arg_spec is None:
-            self._arg_spec = inspect.getfullargspec(self.process)
-        # save the argspec in an instance variable if it hasn't been computed
-        if (self._arg_spec.args is None):
-            return []
+        # computed once per instance - arg names can't change after
+        # construction, and this property sits in the pipeline hot path
+        if self._args is not None:
+            return self._args
+
+        # subclasses like FuncBlock may predefine a full argspec - honor it
+        if self._arg_spec is not None:
+            if (self._arg_spec.args is None):
+                args = []
+            else:
+                # ignoring 'self'
+                args = self._arg_spec.args[1:]
         else:
-            # ignoring 'self'
-            return self._arg_spec.args[1:]
+            # the base block only needs the positional argument names, which
+            # the code object exposes directly. This skips the default/
+            # kwonly/annotation bookkeeping that inspect.getfullargspec does
+            func = getattr(self.process, '__func__', self.process)
+            code = func.__code__
+            names = _ARG_NAMES_CACHE.get(code)
+            if names is None:
+                # ignoring 'self'
+                names = code.co_varnames[1:code.co_argcount]
+                _ARG_NAMES_CACHE[code] = names
+            args = list(names)
+
+        self._args = args
+        return args
 
     ############################################################################
     @property
@@ -530,8 +723,11 @@ class Block(metaclass=ABCMeta):
         part of it's uuid (last 6 characters by default).
         The entropy of this id can be increased by increasing ImagePypelines
         UUID_ORDER variable
+
+        The string is cached because the id is read on every logger fetch -
+        it only changes on a rename or a uuid reset
         """
-        return "{}#{}".format(self.name, self.uuid[-UUID_ORDER:])
+        return self._id
 
 
 # END
@@ -15,7 +15,7 @@ from .io_tools import passgen
 from cryptography.fernet import Fernet
 import inspect
 import numpy as np
-from uuid import uuid4
+from .util import new_uuid
 import networkx as nx
 from networkx.readwrite import json_graph
 import pickle
@@ -118,7 +118,7 @@ class Pipeline(object):
             name (str): name used to generate the logger name
         """
 
-        self.uuid = uuid4().hex # unique univeral hex ID for this pipeline
+        self.uuid = new_uuid() # unique univeral hex ID for this pipeline
         if name is None:
             name = self.__class__.__name__
         self.name = name # string name - used to generate the id
@@ -232,7 +232,7 @@ class Pipeline(object):
             if isinstance(task, (tuple,list)):
                 block = task[0]
                 args = task[1:]
-                node_uuid = block.name + uuid4().hex + '-node'
+                node_uuid = block.name + new_uuid() + '-node'
                 # if we have a tuple input, then the first value MUST be a block
                 if not isinstance(block, Block):
                     raise TypeError("first value in any graph definition tuple must be a Block")
@@ -323,7 +323,7 @@ class Pipeline(object):
             for i,end_name in enumerate(node_attrs['outputs']):
                 # add the leaf
                 leaf = Leaf(end_name)
-                leaf_uuid = leaf.name + uuid4().hex + '-node'
+                leaf_uuid = leaf.name + new_uuid() + '-node'
                 self.graph.add_node(leaf_uuid,
                                     block=leaf,
                                     args=(end_name,),
@@ -1093,7 +1093,7 @@ class Pipeline(object):
     ############################################################################
     def __setstate__(self, state):
         """resets the uuid in the event of a copy"""
-        state['uuid'] = uuid4().hex
+        state['uuid'] = new_uuid()
         self.__dict__.update(state)
         # updates the logger for the new state
         self.logger = get_logger(self.id)
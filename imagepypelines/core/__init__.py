@@ -20,6 +20,12 @@ from .block_subclasses import Input
 from .block_subclasses import Leaf
 from .block_subclasses import PipelineBlock
 
+# comm_tools.py
+from .comm_tools import BaseTCP
+from .comm_tools import TCPServer
+from .comm_tools import BaseCommThread
+from .comm_tools import EventQueue
+
 from .Exceptions import PipelineError
 from .Exceptions import BlockError
 
@@ -38,25 +44,26 @@ from .io_tools import convert_to
 # from .io_tools import ImageWriter
 
 # ml_tools.py
-# from .ml_tools import accuracy
-# from .ml_tools import confidence_99
-# from .ml_tools import confidence_95
-# from .ml_tools import confidence_90
-# from .ml_tools import confidence
-# from .ml_tools import chunk
-# from .ml_tools import batch
-# from .ml_tools import chunks2list
-# from .ml_tools import xsample
-# from .ml_tools import xysample
-# from .ml_tools import ConfigFactory
-# from .ml_tools import Mnist
-# from .ml_tools import MnistFashion
-# from .ml_tools import Cifar10
-# from .ml_tools import Cifar100
+from .ml_tools import accuracy
+from .ml_tools import confidence_99
+from .ml_tools import confidence_95
+from .ml_tools import confidence_90
+from .ml_tools import confidence
+from .ml_tools import chunk
+from .ml_tools import batch
+from .ml_tools import chunks2list
+from .ml_tools import xsample
+from .ml_tools import xysample
+from .ml_tools import ConfigFactory
+from .ml_tools import Mnist
+from .ml_tools import MnistFashion
+from .ml_tools import Cifar10
+from .ml_tools import Cifar100
 
 
 # pipeline_tools.py
 from .pipeline_tools import blockify
+from .pipeline_tools import njit_process
 
 # Pipeline.py
 from .Pipeline import Pipeline
@@ -66,6 +73,8 @@ from .Pipeline import Input
 # util.py
 from .util import print_args
 from .util import arrsummary
+from .util import Tester
+from .util import get_tester
 from .util import timer
 from .util import timer_ms
 from .util import Timer
@@ -96,6 +96,10 @@ class FuncBlock(Block):
         # the source object be in top level of the module)
         if not hasattr(this_module, func.__name__):
             func_copy = FunctionType(func.__code__, globals(), func.__name__)
+            # reset the qualname so pickle resolves the copy at module top
+            # level even if the user defined their function inside another
+            # function or class (otherwise it stays '<parent>.<locals>.<name>')
+            func_copy.__qualname__ = func_copy.__name__
             setattr(this_module, func_copy.__name__, func_copy)
         else:
             raise ValueError("illegal blockified function name: {}".format(func.__name__))
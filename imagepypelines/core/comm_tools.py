@@ -0,0 +1,310 @@
+# @Email: jmaggio14@gmail.com
+# @Website: https://www.imagepypelines.org/
+# @License: https://github.com/jmaggio14/imagepypelines/blob/master/LICENSE
+# @github: https://github.com/jmaggio14/imagepypelines
+#
+# Copyright (c) 2018-2020 Jeff Maggio, Ryan Hartzell, and collaborators
+from ..Logger import get_logger
+
+from collections import deque
+from itertools import count
+import heapq
+import socket
+import struct
+import threading
+import time
+
+COMM_LOGGER = get_logger('COMM')
+
+RECV_CHUNK = 65536
+"""maximum number of bytes pulled off the socket per recv call"""
+
+SOCKET_BUFSIZE = 4 * 1024 * 1024
+"""requested kernel send/receive buffer size for comm sockets"""
+
+
+################################################################################
+#                                    TCP
+################################################################################
+class BaseTCP(object):
+    """Base object for message-oriented TCP communication. Messages are
+    framed with an 8 byte big-endian length prefix so arbitrary payloads
+    can be exchanged over the stream
+
+    Attributes:
+        _s(:obj:`socket.socket`): the underlying socket
+    """
+    def __init__(self):
+        self._s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._configure_socket()
+
+    ############################################################################
+    def _configure_socket(self):
+        """applies the comm socket options to the underlying socket"""
+        # messages are written whole, so Nagle buffering only adds latency
+        self._s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # large kernel buffers let bulk messages move with fewer
+        # recv/send syscalls per MB (the kernel clamps to its own limits)
+        self._s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFSIZE)
+        self._s.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFSIZE)
+
+    ############################################################################
+    @classmethod
+    def from_socket(cls, sock):
+        """wraps an already-open socket - typically one handed out by
+        :obj:`TCPServer.accept` - without allocating a fresh kernel socket
+        just to throw it away
+
+        Args:
+            sock(:obj:`socket.socket`): a connected TCP socket
+
+        Returns:
+            :obj:`BaseTCP`: message-oriented wrapper around the socket
+        """
+        tcp = cls.__new__(cls)
+        tcp._s = sock
+        tcp._configure_socket()
+        return tcp
+
+    ############################################################################
+    @staticmethod
+    def recvall(c, length):
+        """receives exactly `length` bytes from the given socket
+
+        the payload is written directly into one preallocated buffer with
+        recv_into. appending each chunk to a bytes object instead would
+        reallocate and copy the accumulated message on every iteration -
+        quadratic in message size - leaving large reads memcpy-bound
+        instead of bandwidth-bound
+
+        Args:
+            c(:obj:`socket.socket`): connected socket to read from
+            length(int): exact number of bytes to receive
+
+        Returns:
+            bytes: the received payload
+        """
+        buf = bytearray(length)
+        view = memoryview(buf)
+        pos = 0
+        while pos < length:
+            n = c.recv_into(view[pos:], min(length - pos, RECV_CHUNK))
+            if n == 0:
+                raise ConnectionError(
+                        "socket closed with %d bytes outstanding"
+                        % (length - pos))
+            pos += n
+        return bytes(buf)
+
+    ############################################################################
+    def connect(self, host, port):
+        """connects the underlying socket to the given address"""
+        self._s.connect( (host, port) )
+        COMM_LOGGER.info("connected to %s:%s", host, port)
+
+    ############################################################################
+    def read(self):
+        """reads one length-prefixed message off the socket
+
+        Returns:
+            bytes: the message payload
+        """
+        # the header must go through recvall too - a bare recv(8) can
+        # legally return fewer than 8 bytes and corrupt the framing
+        header = self.recvall(self._s, 8)
+        (length,) = struct.unpack('>Q', header)
+        return self.recvall(self._s, length)
+
+    ############################################################################
+    def write(self, msg_b):
+        """writes one length-prefixed message to the socket
+
+        header and payload go out in a single syscall - two sendalls per
+        message doubles the syscall count and interacts badly with
+        delayed ACKs for small messages
+
+        Args:
+            msg_b(bytes): the message payload
+        """
+        header = struct.pack('>Q', len(msg_b))
+        if (len(msg_b) < RECV_CHUNK) or not hasattr(self._s, 'sendmsg'):
+            # sendmsg is unix-only, so platforms without it (windows)
+            # take the concat path for every size - one extra memcpy is
+            # cheap next to the syscall
+            self._s.sendall(header + msg_b)
+        else:
+            # sendmsg gathers the header and a large payload without
+            # copying them into one concatenated buffer first. unlike
+            # sendall it can stop short on a full send buffer, so finish
+            # any tail explicitly
+            sent = self._s.sendmsg([header, msg_b])
+            tail_start = sent - len(header)
+            if tail_start < 0:
+                self._s.sendall(header[sent:])
+                tail_start = 0
+            if tail_start < len(msg_b):
+                self._s.sendall( memoryview(msg_b)[tail_start:] )
+
+    ############################################################################
+    def close(self):
+        """closes the underlying socket"""
+        self._s.close()
+
+
+################################################################################
+class TCPServer(BaseTCP):
+    """TCP server which listens on the given address and hands out
+    connected sockets
+
+    Args:
+        host(str): interface to bind to
+        port(int): port to listen on
+
+    Attributes:
+        host(str): interface bound to
+        port(int): port listened on
+    """
+    def __init__(self, host, port):
+        super().__init__()
+        self.host = host
+        self.port = port
+
+        self._s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # where the platform supports it, let multiple workers bind the
+        # same port and have the kernel balance incoming flows
+        if hasattr(socket, 'SO_REUSEPORT'):
+            self._s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        self._s.bind( (host, port) )
+        self._s.listen()
+        COMM_LOGGER.info("listening on %s:%s", host, port)
+
+    ############################################################################
+    def accept(self):
+        """blocks until a client connects
+
+        the returned socket can be wrapped for framed messaging with
+        :obj:`BaseTCP.from_socket`
+
+        Returns:
+            :obj:`socket.socket`: the connected client socket
+            tuple: the client (host, port) address
+        """
+        conn, addr = self._s.accept()
+        COMM_LOGGER.info("accepted connection from %s:%s", addr[0], addr[1])
+        return conn, addr
+
+
+################################################################################
+#                                  THREADING
+################################################################################
+class BaseCommThread(threading.Thread):
+    """base daemon thread for communication workers. Subclasses implement
+    `run` and poll `self.stopped` in their main loop so the thread can be
+    shut down cooperatively with `stop()`
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.daemon = True
+        self._stop_event = threading.Event()
+
+    ############################################################################
+    def stop(self):
+        """signals the thread's main loop to exit"""
+        self._stop_event.set()
+
+    ############################################################################
+    def __enter__(self):
+        """starts the worker asynchronously - running run() inline would
+        serialize the with-block on the caller's thread"""
+        self.start()
+        return self
+
+    ############################################################################
+    def __exit__(self, exc_type, exc_value, traceback):
+        """signals the worker to stop and waits for it to exit"""
+        self.stop()
+        self.join()
+
+    ############################################################################
+    #                               properties
+    ############################################################################
+    @property
+    def stopped(self):
+        """bool: whether or not the thread has been told to stop"""
+        return self._stop_event.is_set()
+
+
+################################################################################
+#                                 SCHEDULING
+################################################################################
+class EventQueue(object):
+    """priority queue of scheduled callables, ordered by the time they
+    become due
+
+    `add_task` may be called from any thread without taking a lock -
+    submissions land in a deque inbox (append is atomic in CPython) and
+    the consumer folds them into the heap at the start of each drain.
+    `run_scheduled_tasks` must only be called from one thread at a time
+
+    Example:
+        >>> import imagepypelines as ip
+        >>> events = ip.EventQueue()
+        >>> events.add_task(0, lambda: None)
+        >>> events.run_scheduled_tasks()
+    """
+    def __init__(self):
+        self._heap = []
+        self._inbox = deque()
+        self._counter = count()
+
+    ############################################################################
+    def add_task(self, wait, task):
+        """schedules the task to run `wait` seconds from now. Never blocks
+        and is safe to call from any thread
+
+        Args:
+            wait(float): seconds from now the task becomes due
+            task(callable): zero-arg callable to run
+        """
+        self._inbox.append( (time.monotonic() + wait, task) )
+
+    ############################################################################
+    def run_scheduled_tasks(self):
+        """runs every task that was due when the call started, in due order"""
+        heap = self._heap
+
+        # fold newly submitted tasks into the heap - popleft is the single
+        # consumer side of the inbox, so no lock is needed. entries are
+        # plain (eta, seq, task) tuples so heap comparisons hit tuple
+        # ordering directly with the sort key at index 0, and the seq
+        # field breaks eta ties so ordering never falls through to
+        # comparing the task callables - which raises TypeError
+        inbox = self._inbox
+        batch = []
+        while inbox:
+            eta, task = inbox.popleft()
+            batch.append( (eta, next(self._counter), task) )
+
+        # large batches (periodic tasks all rescheduling each tick) are
+        # folded with one O(n) heapify instead of n O(log n) pushes -
+        # only rebuild when it's worth it
+        if len(batch) > 16:
+            heap.extend(batch)
+            heapq.heapify(heap)
+        else:
+            for event in batch:
+                heapq.heappush(heap, event)
+
+        # one clock read for the whole drain - re-reading per iteration
+        # costs a vdso call per task and lets a slow task pull newly-due
+        # work into the current drain indefinitely
+        now = time.monotonic()
+        while heap and (heap[0][0] <= now):
+            heapq.heappop(heap)[2]()
+
+    ############################################################################
+    def __len__(self):
+        return len(self._heap) + len(self._inbox)
+
+
+# END
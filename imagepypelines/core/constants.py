@@ -7,7 +7,7 @@
 import numpy as np
 
 # MODIFY THIS VARIABLE EVERY TIME A NEW IMPORTABLE CONSTANT IS ADDED
-# You must also modify the unit test 'test_constants' located in test_core.py
+# the unit test 'test_constants' in tests/constants_test.py checks this list
 __all__ = [
             'UUID_ORDER',
             'NUMPY_TYPES',
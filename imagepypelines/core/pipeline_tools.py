@@ -62,3 +62,48 @@ def blockify(kwargs={},
                         shapes=shapes,
                         containers=containers)
     return _blockify
+
+
+################################################################################
+def njit_process(func):
+    """decorator which jit-compiles a numeric process kernel with numba
+
+    Block process functions that loop over image batches in pure python are
+    exactly the workload numba accelerates by orders of magnitude. Decorate
+    the numeric inner kernel of your block with this and call it from
+    `process`. numba is not an imagepypelines dependency - if it isn't
+    installed the undecorated pure python function is returned, so blocks
+    written with this decorator work (slowly) everywhere.
+
+    Args:
+        func (callable): a numeric function operating on ndarrays. It must
+            be compilable in numba's nopython mode - no python objects,
+            just scalars and arrays
+
+    Returns:
+        callable: the jit-compiled kernel, or `func` unchanged if numba
+        isn't installed
+
+    Example:
+        >>> import imagepypelines as ip
+        >>> import numpy as np
+        >>>
+        >>> class AddOne(ip.Block):
+        ...     @staticmethod
+        ...     @ip.njit_process
+        ...     def _kernel(batch):
+        ...         return batch + 1
+        ...
+        ...     def process(self, batch):
+        ...         return self._kernel( np.asarray(batch) )
+    """
+    try:
+        from numba import njit
+    except ImportError:
+        # no numba - hand back the pure python function unchanged
+        return func
+
+    # cache=True persists the compiled artifact so later runs skip jit
+    # warmup. fastmath is deliberately left off - it asserts no-NaN/Inf
+    # to LLVM, and NaN is a routine sentinel in imaging data
+    return njit(cache=True)(func)
@@ -5,13 +5,35 @@
 #
 # Copyright (c) 2018-2020 Jeff Maggio, Ryan Hartzell, and collaborators
 from ..Logger import get_logger
+import functools
 import inspect
 import collections
+import logging
+import os
 import time
 from termcolor import colored
 import numpy as np
 
 TIMER_LOGGER = get_logger('TIMER')
+TESTER_LOGGER = get_logger('TESTER')
+
+
+################################################################################
+#                                   UUID
+################################################################################
+
+def new_uuid():
+    """generates a new random hex uuid string
+
+    identical in entropy and format to `uuid.uuid4().hex`, but draws the
+    random bytes directly - blocks and pipelines only ever use the hex
+    string, so the intermediate UUID object is pure overhead when
+    constructing large pipelines
+
+    Returns:
+        str: 32 character hex string
+    """
+    return os.urandom(16).hex()
 
 
 ################################################################################
@@ -106,6 +128,180 @@ def print_args(func):
     return _print_args
 
 
+################################################################################
+#                                 TESTING
+################################################################################
+
+_ndarray_equal = None
+"""ndarray comparator built lazily by _get_ndarray_equal"""
+
+
+def _get_ndarray_equal():
+    """fetches the ndarray comparator, building it on first use
+
+    numba is not an imagepypelines dependency and importing it (plus
+    llvmlite) is slow, so the import is deferred until an ndarray
+    comparison is actually requested. The numpy fallback produces
+    identical results when numba isn't installed
+    """
+    global _ndarray_equal
+    if _ndarray_equal is not None:
+        return _ndarray_equal
+
+    try:
+        from numba import njit
+
+        @njit(cache=True)
+        def _kernel(a, b):
+            """jit-compiled elementwise equality scan which exits on the first
+            mismatching element. `cache=True` saves the compiled artifact so
+            repeated runs skip jit warmup"""
+            for i in range(a.size):
+                if a.flat[i] != b.flat[i]:
+                    return False
+            return True
+
+    except ImportError:
+        def _kernel(a, b):
+            """numpy fallback for the jit-compiled equality scan"""
+            return bool( np.array_equal(a, b) )
+
+    _ndarray_equal = _kernel
+    return _ndarray_equal
+
+
+def _exact_ndarray_test(produced, desired):
+    """compares two ndarrays elementwise, short-circuiting on metadata
+
+    shape and dtype are compared before any element is touched so
+    mismatched arrays are rejected in O(1)
+    """
+    if (produced.shape != desired.shape) or (produced.dtype != desired.dtype):
+        return False
+    return bool( _get_ndarray_equal()(produced, desired) )
+
+
+class Tester(object):
+    """Testing object used to simplify testing of a target function. Runs the
+    target with the given arguments and compares the output against a known
+    desired output
+
+    Args:
+        target (callable): function or callable to test
+        verbose (bool): whether or not to log test results. defaults to True
+
+    Attributes:
+        target: the callable being tested
+        verbose: whether or not test results are logged
+
+    Example:
+        >>> import imagepypelines as ip
+        >>>
+        >>> def add_one(a):
+        ...    return a + 1
+        >>>
+        >>> tester = ip.Tester(add_one)
+        >>> tester.exact_test(2, 1)
+        True
+    """
+    def __init__(self, target, verbose=True):
+        """Instantiation function
+
+        Args:
+            target (callable): function or callable to test
+            verbose (bool): whether or not to log test results
+        """
+        # ERROR CHECKING
+        if not callable(target):
+            error_msg = "'target' input must be a callable"
+            raise TypeError(error_msg)
+        # END ERROR CHECKING
+        self.target = target
+        self.verbose = verbose
+        # resolved once - the name is re-read on every logged test result
+        self._name = getattr(target, '__name__', str(target))
+
+    def exact_test(self, desired_output, *args, **kwargs):
+        """runs the target with the given args and checks that the produced
+        output is identical to the desired output
+
+        ndarray outputs are compared with an elementwise comparator that
+        short-circuits on the first mismatch instead of a python-level `==`
+
+        Args:
+            desired_output: the exact output the target must produce
+            *args: positional arguments to run the target with
+            **kwargs: keyword arguments to run the target with
+
+        Returns:
+            bool: whether or not the target produced the desired output
+        """
+        # exceptions are a distinct failure mode handled here, once -
+        # keeping _run_target itself a straight call means successful
+        # invocations pay no try/except setup
+        try:
+            out = self._run_target(*args, **kwargs)
+        except Exception as e:
+            if self.verbose:
+                TESTER_LOGGER.error("'%s' raised %s during testing"
+                                    % (self.name, e))
+            return False
+
+        if isinstance(out, np.ndarray) and isinstance(desired_output, np.ndarray):
+            passed = _exact_ndarray_test(out, desired_output)
+        elif isinstance(out, np.ndarray) or isinstance(desired_output, np.ndarray):
+            # mixed ndarray/sequence comparison. np.array_equal converts and
+            # compares at C level (short-circuiting on shape) and returns a
+            # real bool instead of an elementwise boolean array
+            passed = bool( np.array_equal(out, desired_output) )
+        else:
+            passed = (out == desired_output)
+
+        if self.verbose:
+            if passed:
+                TESTER_LOGGER.info("'%s' exact test passed" % self.name)
+            else:
+                TESTER_LOGGER.error("'%s' exact test failed" % self.name)
+
+        return passed
+
+    def _run_target(self, *args, **kwargs):
+        """runs the target with the given arguments and returns its raw
+        output. exceptions propagate to the caller - swallowing them here
+        and returning None would let a crashing target 'pass' a test
+        against a None desired output"""
+        return self.target(*args, **kwargs)
+
+    @property
+    def name(self):
+        """str: the name of the target callable"""
+        return self._name
+
+    def __str__(self):
+        return "Tester({})".format(self.name)
+
+    def __repr__(self):
+        return str(self)
+
+
+@functools.lru_cache(maxsize=None)
+def get_tester(target, verbose=True):
+    """fetches a memoized Tester for the given callable
+
+    Tester construction is cheap, but test code tends to rebuild a Tester
+    for the same target over and over - this caches one instance per
+    (target, verbose) pair
+
+    Args:
+        target (callable): function or callable to test
+        verbose (bool): whether or not to log test results. defaults to True
+
+    Returns:
+        :obj:`Tester`: the cached Tester for this target
+    """
+    return Tester(target, verbose)
+
+
 ################################################################################
 #                                 SUMMARY
 ################################################################################
@@ -115,14 +311,23 @@ def arrsummary(arr):
     """returns a Summarizer object for the given array"""
     return Summarizer(arr)
 
-class Summarizer(dict):
+_SUMMARY_CACHE = collections.OrderedDict()
+"""bounded LRU cache of (array, summary, string) triplets shared by all
+Summarizer instances, keyed by the array's buffer address, shape and
+dtype. only read-only arrays are cached - see Summarizer.__update"""
+
+_SUMMARY_CACHE_SIZE = 128
+"""maximum number of cached array summaries before LRU eviction"""
+
+
+class Summarizer(object):
     """
     Summarization object for numpy array. The primary job of this
     object is to streamline and simply printing out numpy array objects
     which normally appear as a stream of barely comprehendable data
 
-    This dictionary subclass will return the following when printed out
-    or otherwise stringified
+    This object will return the following when printed out or otherwise
+    stringified, and supports dict-style access to the summary fields
 
     Args:
         input_array (np.ndarray): input array to summarize
@@ -143,6 +348,12 @@ class Summarizer(dict):
         >>> print(a)
         [ARRAY SUMMARY | shape: (512, 512) | size: 262144 | max: 1.0 | min: 0.0 | mean: 0.5 | dtype: float64]
     """
+    # a plain-object Summarizer with __slots__ is a fraction of the size
+    # of the old dict subclass, which matters when one is built per log
+    # line. summary fields live only in last_summary instead of being
+    # mirrored into the instance itself
+    __slots__ = ('input_array', 'last_summary', 'last_string', '_cache_key')
+
     def __init__(self, input_array):
         """Instantiation function
 
@@ -158,6 +369,8 @@ class Summarizer(dict):
         self.input_array = input_array
         self.last_summary = None
         self.last_string = None
+        # identity of the array the cached summary was computed from
+        self._cache_key = None
         self.__update()
 
     def __str__(self):
@@ -182,31 +395,92 @@ class Summarizer(dict):
     def __update(self):
         """
         updates the last_summary and last_string internal attributes
+
+        the stats require full passes over the array, so they are only
+        recomputed when the array looks different from the one summarized
+        last time - repeated prints of the same array are O(1)
+
+        read-only arrays are also shared across instances through a
+        module-level LRU cache, so summarizing the same frozen tensor at
+        multiple log sites only ever traverses it once
         """
-        summary = {
-        'shape': self.input_array.shape,
-        'size': self.input_array.size,
-        'max': round(self.input_array.max(), 3),
-        'min': round(self.input_array.min(), 3),
-        'mean': round(self.input_array.mean(), 3),
-        'dtype': self.input_array.dtype,
+        key = (id(self.input_array),
+                self.input_array.shape,
+                self.input_array.nbytes)
+        if key == self._cache_key:
+            return
+
+        # only read-only arrays go through the shared cache - a writable
+        # array can be mutated in place between summaries, and nothing in
+        # the key would distinguish the stale entry from fresh data
+        if self.input_array.flags.writeable:
+            self.last_summary = self._compute_summary()
+            self.last_string = self._compute_string(self.last_summary)
+            self._cache_key = key
+            return
+
+        # key the shared cache by the array's buffer address since
+        # ndarrays aren't weak-refable. each entry pins the source array
+        # with a strong reference and hits are validated against it -
+        # otherwise a new array allocated at a freed array's recycled
+        # address would return the dead array's stats
+        cache_key = (self.input_array.__array_interface__['data'][0],
+                        self.input_array.shape,
+                        self.input_array.dtype.str)
+        cached = _SUMMARY_CACHE.get(cache_key)
+        if (cached is not None) and (cached[0] is self.input_array):
+            _SUMMARY_CACHE.move_to_end(cache_key)
+            self.last_summary, self.last_string = cached[1], cached[2]
+        else:
+            self.last_summary = self._compute_summary()
+            self.last_string = self._compute_string(self.last_summary)
+            _SUMMARY_CACHE[cache_key] = (self.input_array,
+                                            self.last_summary,
+                                            self.last_string)
+            if len(_SUMMARY_CACHE) > _SUMMARY_CACHE_SIZE:
+                _SUMMARY_CACHE.popitem(last=False)
+
+        self._cache_key = key
+
+    def _compute_summary(self):
+        """computes the summary dictionary - the only place the array is
+        actually traversed"""
+        arr = self.input_array
+        # run all three reductions over one contiguous flat view so numpy
+        # dispatches its SIMD inner loops instead of the strided generic
+        # ones. ravel only copies when the array isn't already contiguous,
+        # and then the copy is paid once instead of per reduction
+        flat = arr.ravel()
+        return {
+        'shape': arr.shape,
+        'size': arr.size,
+        'max': round(flat.max(), 3),
+        'min': round(flat.min(), 3),
+        'mean': round(flat.mean(), 3),
+        'dtype': arr.dtype,
         }
 
-        string = "[ARRAY SUMMARY | "  \
-                + "shape: {shape} | " \
-                + "size: {size} | " \
-                + "max: {max} | " \
-                + "min: {min} | " \
-                + "mean: {mean} | " \
-                + "dtype: {dtype}]"
+    @staticmethod
+    def _compute_string(summary):
+        """formats the representation string from a summary dictionary"""
+        # an f-string compiles to BUILD_STRING bytecode - no format-spec
+        # parsing or template concatenation per call
+        return (f"[ARRAY SUMMARY | "
+                f"shape: {summary['shape']} | "
+                f"size: {summary['size']} | "
+                f"max: {summary['max']} | "
+                f"min: {summary['min']} | "
+                f"mean: {summary['mean']} | "
+                f"dtype: {summary['dtype']}]")
 
-        string = string.format( **summary )
 
-        self.last_summary = summary
-        self.last_string = string
-
-        self.update(self.last_summary)
+    def __getitem__(self, key):
+        """dict-style access to the summary fields"""
+        return self.last_summary[key]
 
+    def keys(self):
+        """returns the summary field names"""
+        return self.last_summary.keys()
 
     def __repr__(self):
         return str(self)
@@ -216,6 +490,10 @@ class Summarizer(dict):
 #                                 TIMING
 ################################################################################
 
+_time = time.time
+"""local alias so hot timing paths skip the module attribute lookup"""
+
+
 def timer(func):
     """Decorator to time how long a func takes to run in milliseconds
 
@@ -230,13 +508,20 @@ def timer(func):
         >>> sleep_for_one_sec() # doctest: +ELLIPSIS
         ...
     """
+    # bound once at decoration time so each call pays for two clock reads
+    # and nothing else - no Timer allocation, no attribute lookups
+    name = func.__name__
+
     def _timer(*args,**kwargs):
-        t = Time()
+        # when TIMER logging is off, skip the timing too - decorated
+        # functions in tight loops pay only for this level check
+        if not TIMER_LOGGER.isEnabledFor(logging.INFO):
+            return func(*args,**kwargs)
+
+        t0 = _time()
         ret = func(*args,**kwargs)
-        run_time = t.time()
-        msg = "ran function '{name}' in {t}sec".format(name=func.__name__,
-                                                            t=run_time)
-        TIMER_LOGGER.info(msg)
+        # %-style args defer formatting to the logging machinery
+        TIMER_LOGGER.info("ran function '%s' in %.3fsec", name, _time() - t0)
 
         return ret
 
@@ -257,13 +542,21 @@ def timer_ms(func):
         >>> sleep_for_one_sec() # doctest: +ELLIPSIS
         ...
     """
+    # bound once at decoration time so each call pays for two clock reads
+    # and nothing else - no Timer allocation, no attribute lookups
+    name = func.__name__
+
     def _timer_ms(*args,**kwargs):
-        t = Time()
+        # when TIMER logging is off, skip the timing too - decorated
+        # functions in tight loops pay only for this level check
+        if not TIMER_LOGGER.isEnabledFor(logging.INFO):
+            return func(*args,**kwargs)
+
+        t0 = _time()
         ret = func(*args,**kwargs)
-        run_time_ms = t.time_ms
-        msg = "ran function '{name}' in {t}ms".format(name=func.__name__,
-                                                            t=run_time_ms)
-        TIMER_LOGGER.info(msg)
+        # %-style args defer formatting to the logging machinery
+        TIMER_LOGGER.info("ran function '%s' in %.3fms", name,
+                            (_time() - t0) * 1000)
 
         return ret
 
@@ -304,7 +597,7 @@ class Timer(object):
 
     """
     def __init__(self):
-        self._start = time.time()
+        self._start = _time()
         self._last = self._start
 
         self._countdown_timer = None
@@ -322,11 +615,11 @@ class Timer(object):
 
     def raw_time(self):
         """returns the unrounded time in seconds since the timer started"""
-        return time.time() - self._start
+        return _time() - self._start
 
     def lap(self):
         """returns time in seconds since last time the lap was called"""
-        now = time.time()
+        now = _time()
         lap = now - self._last
         self._last = now
         return round(lap,3)
@@ -357,7 +650,7 @@ class Timer(object):
         if not isinstance(value,(int,float)):
             error_msg = "countdown must be set using a float \
                         or an int, current type is {0}".format(type(value))
-            core.error(error_msg)
+            TIMER_LOGGER.error(error_msg)
             raise TypeError(error_msg)
 
         self._countdown_timer = Timer()
@@ -0,0 +1,44 @@
+import pytest
+
+
+@pytest.fixture(scope="session")
+def ip():
+    """imports imagepypelines exactly once for the whole test session
+
+    importing imagepypelines triggers logger construction and plugin
+    loading, so individual tests should reuse this fixture instead of
+    re-importing the package themselves
+    """
+    import imagepypelines as ip
+    return ip
+
+
+@pytest.fixture(scope="session")
+def pipeline1(ip):
+    """reference pipeline shared by the pipeline test modules
+
+    session-scoped because blockified function names are registered in the
+    imagepypelines namespace and can only be defined once per session
+    """
+    @ip.blockify( types={'a':int, 'b':int}, kwargs=dict(value=10) )
+    def add_val(a,b,value):
+        return a+value, b+value
+
+    @ip.blockify( types={'a':int, 'b':int}, kwargs=dict(value=5) )
+    def minus_val(a,b,value):
+        return a-value, b-value
+
+
+    tasks = {
+            # inputs
+            'zero' : ip.Input(0),
+            'one' : ip.Input(1),
+            # operations
+            ('ten','eleven') : (add_val, 'zero', 'one'),
+            ('twenty','eleven2') : (add_val, 'ten', 'one'),
+            ('fifteen', 'six') : (minus_val, 'twenty', 'eleven'),
+            ('twentyfive','twentyone') : (add_val, 'fifteen','eleven2'),
+            ('negativefour', 'negativefive') : (minus_val, 'one', 'zero'),
+            }
+
+    return ip.Pipeline(tasks, 'Pipeline1')
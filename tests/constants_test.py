@@ -0,0 +1,14 @@
+import imagepypelines as ip
+
+from imagepypelines.core import constants
+
+# computed once at collection time so every membership check below is an O(1)
+# hashed lookup instead of an O(n) scan of a freshly built dir() list
+_IP_NAMES = frozenset(dir(ip))
+
+
+def test_constants():
+    """every constant exported by core.constants must be reachable from the
+    top-level imagepypelines namespace"""
+    missing = [name for name in constants.__all__ if name not in _IP_NAMES]
+    assert not missing
@@ -0,0 +1,18 @@
+def test_copy(ip, pipeline1):
+    # COPY CHECK
+    print('SHALLOW COPY')
+    pipeline4 = pipeline1.copy("Pipeline4")
+    assert pipeline1.uuid != pipeline4.uuid
+
+    # check to make sure all blocks are identical
+    assert pipeline4.blocks == pipeline4.blocks.intersection(pipeline1.blocks)
+
+
+def test_deepcopy(ip, pipeline1):
+    # DEEP COPY CHECK
+    print('DEEP COPY')
+    pipeline5 = pipeline1.deepcopy("Pipeline5")
+    assert pipeline1.uuid != pipeline5.uuid
+
+    # check to make sure all blocks are different
+    assert len( pipeline5.blocks.intersection(pipeline1.blocks) ) == 0
@@ -1,86 +1,44 @@
 import numpy as np
+import pytest
 
 
-
-def testcore():
-    import imagepypelines as ip
-    # ###############################################################################
-    #                                 General Testing
-    # ###############################################################################
-    # Blockify testing
-    @ip.blockify( types={'a':int, 'b':int}, kwargs=dict(value=10) )
-    def add_val(a,b,value):
-        return a+value, b+value
-
-    @ip.blockify( types={'a':int, 'b':int}, kwargs=dict(value=5) )
-    def minus_val(a,b,value):
-        return a-value, b-value
-
-
-    tasks = {
-            # inputs
-            'zero' : ip.Input(0),
-            'one' : ip.Input(1),
-            # operations
-            ('ten','eleven') : (add_val, 'zero', 'one'),
-            ('twenty','eleven2') : (add_val, 'ten', 'one'),
-            ('fifteen', 'six') : (minus_val, 'twenty', 'eleven'),
-            ('twentyfive','twentyone') : (add_val, 'fifteen','eleven2'),
-            ('negativefour', 'negativefive') : (minus_val, 'one', 'zero'),
-            }
-
-    ################################################################################
-    # PIPELINE CONSTRUCTION FROM TASKS
-    print('RAW CONSTRUCTION')
-    pipeline1 = ip.Pipeline(tasks, 'Pipeline1')
-    # pipeline1.draw(show=True)
-
+@pytest.mark.parametrize("method", ["get_tasks", "save_load"])
+def test_pipeline_reconstruction(ip, pipeline1, method, tmp_path):
+    """reconstructed pipelines must produce identical output with a new uuid,
+    regardless of how they were reconstructed"""
     processed1 = pipeline1.process([0,0], [1,1])
-    # print(processed1)
-
-    print('types:', pipeline1.types)
-    print('shapes:', pipeline1.shapes)
-    print('containers:', pipeline1.containers)
-
 
-    ################################################################################
-    # PIPELINE2 CONSTRUCTION FROM get_tasks()
-    print('CONSRUCTION FROM get_tasks()')
-    static_constructor = pipeline1.get_tasks()
+    if method == "get_tasks":
+        # PIPELINE CONSTRUCTION FROM get_tasks()
+        pipeline2 = ip.Pipeline(pipeline1.get_tasks(), name="Pipeline2")
+    else:
+        # SAVING AND LOADING
+        fname = str(tmp_path / "pipeline.pck")
+        checksum = pipeline1.save(fname, "password")
+        pipeline2 = ip.Pipeline.load(fname, "password", checksum, name="Pipeline2")
 
-    pipeline2 = ip.Pipeline(static_constructor, name="Pipeline2")
     processed2 = pipeline2.process([0,0], one=[1,1])
 
     assert processed1 == processed2
     assert pipeline1.uuid != pipeline2.uuid
 
-    ################################################################################
-    # SAVING AND LOADING CHECK
-    print("SAVING AND LOADING")
-    checksum = pipeline2.save("pipeline.pck","password")
-    pipeline3 = ip.Pipeline.load("pipeline.pck", "password", checksum, name="Pipeline3")
-
-    processed3 = pipeline3.process([0,0], one=[1,1])
-    assert processed1 == processed3
-    assert pipeline2.uuid != pipeline3.uuid
-
-    ################################################################################
-    # COPY CHECK
-    print('SHALLOW COPY')
-    pipeline4 = pipeline3.copy("Pipeline4")
-    assert pipeline3.uuid != pipeline4.uuid
-
-    # check to make sure all blocks are identical
-    assert pipeline4.blocks == pipeline4.blocks.intersection(pipeline3.blocks)
-
-    ################################################################################
-    # DEEP COPY CHECK
-    print('DEEP COPY')
-    pipeline5 = pipeline4.deepcopy("Pipeline5")
-    assert pipeline4.uuid != pipeline5.uuid
-
-    # check to make sure all blocks are different
-    assert len( pipeline5.blocks.intersection(pipeline4.blocks) ) == 0
+
+def test_process(ip, pipeline1):
+    # PIPELINE PROCESSING FROM TASKS
+    processed = pipeline1.process([0,0], [1,1])
+
+    assert list(processed['zero']) == [0, 0]
+    assert list(processed['one']) == [1, 1]
+    assert list(processed['twenty']) == [20, 20]
+    assert list(processed['twentyfive']) == [25, 25]
+    assert list(processed['negativefour']) == [-4, -4]
+
+
+def test_introspection(ip, pipeline1):
+    # the enforcement dicts must cover exactly the pipeline inputs
+    assert pipeline1.types == {'zero': (int,), 'one': (int,)}
+    assert sorted(pipeline1.shapes) == ['one', 'zero']
+    assert sorted(pipeline1.containers) == ['one', 'zero']
 
 
 
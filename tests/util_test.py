@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from imagepypelines.core import util
+
+
+def comparator_variants():
+    """collects the available ndarray comparator implementations
+
+    when numba is installed, the comparator is the jit-compiled kernel and
+    exposes the uncompiled original as `.py_func` - both paths must produce
+    identical results. without numba only the numpy fallback exists
+    """
+    comparator = util._get_ndarray_equal()
+    variants = [comparator]
+    py_func = getattr(comparator, 'py_func', None)
+    if py_func is not None:
+        variants.append(py_func)
+    return variants
+
+
+@pytest.mark.parametrize("comparator", comparator_variants())
+def test_ndarray_comparator(comparator):
+    a = np.arange(12, dtype=np.float64).reshape(3, 4)
+
+    assert comparator(a, a.copy())
+
+    b = a.copy()
+    b[2, 3] += 1
+    assert not comparator(a, b)
+
+
+def test_exact_test(ip):
+    tester = ip.Tester(np.sqrt, verbose=False)
+
+    assert tester.exact_test(np.array([1., 2., 3.]), np.array([1., 4., 9.]))
+    assert not tester.exact_test(np.array([1., 2., 4.]), np.array([1., 4., 9.]))
+    # metadata short-circuit: wrong shape and wrong dtype
+    assert not tester.exact_test(np.ones(4), np.ones((2, 2)))
+    assert not tester.exact_test(np.ones(4, dtype=np.float32), np.ones(4))